@@ -1,11 +1,24 @@
 from typing import Callable, Optional
 
 import numpy as np
-from PyQt6.QtCore import QPoint, QPointF, QSize, Qt
+from PyQt6 import sip
+from PyQt6.QtCore import QPoint, QPointF, QRect, QRectF, QSize, Qt, QTimer
 from PyQt6.QtGui import QColor, QImage, QPainter, QPen
 from PyQt6.QtWidgets import QWidget
 
 
+def _wrap_qimage(arr: np.ndarray) -> QImage:
+    """Wrap a C-contiguous (H, W, 4) uint8 array in a QImage without copying.
+
+    Passing the buffer through sip.voidptr keeps PyQt6 from snapshotting the
+    pixel data; the array is attached to the QImage so it outlives the wrapper.
+    """
+    H, W, _ = arr.shape
+    qimg = QImage(sip.voidptr(arr.ctypes.data), W, H, 4 * W, QImage.Format.Format_RGBA8888)
+    qimg._owner = arr
+    return qimg
+
+
 class CanvasWidget(QWidget):
     def __init__(
         self,
@@ -42,35 +55,91 @@ class CanvasWidget(QWidget):
         self._zoom = 1.0
         self._last_pos: Optional[QPoint] = None
         self._hover_pos: Optional[QPoint] = None
+        # Coalesce high-rate mouse-move events to ~60 Hz; intermediate points
+        # are interpolated in _flush_pending so strokes stay gapless.
+        self._pending_pos: Optional[QPoint] = None
+        self._last_applied: Optional[tuple[int, int]] = None
+        self._repaint_timer = QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.setInterval(16)
+        self._repaint_timer.timeout.connect(self._flush_pending)
+        # Reused per-frame objects: the hover pen never changes and the QImage
+        # wrapper stays valid as long as the underlying buffer does.
+        self._hover_pen = QPen(QColor(0, 255, 0, 180))
+        self._hover_pen.setStyle(Qt.PenStyle.DashLine)
+        self._qimg: Optional[QImage] = None
+        self._qimg_shape: Optional[tuple[int, ...]] = None
+        self._qimg_data_ptr = 0
         self.setMouseTracking(True)
 
+    def mark_dirty(self, rect: Optional[tuple[int, int, int, int]]):
+        """Schedule a repaint of the given inclusive (y0, x0, y1, x1) image rect.
+
+        Falls back to a full repaint when no rect is known.
+        """
+        if rect is None:
+            self.update()
+            return
+        y0, x0, y1, x1 = rect
+        z = self._zoom
+        # Pad by a pixel on each side for zoom rounding.
+        self.update(
+            QRect(
+                int(x0 * z) - 1,
+                int(y0 * z) - 1,
+                int((x1 - x0 + 1) * z) + 3,
+                int((y1 - y0 + 1) * z) + 3,
+            )
+        )
+
+    def _exposed_image_rect(self, event_rect: QRect, H: int, W: int) -> Optional[QRectF]:
+        """Map the exposed widget rect back to image coordinates, clipped to bounds."""
+        z = self._zoom
+        x0 = max(0, int(event_rect.left() / z) - 1)
+        y0 = max(0, int(event_rect.top() / z) - 1)
+        x1 = min(W, int(event_rect.right() / z) + 2)
+        y1 = min(H, int(event_rect.bottom() / z) + 2)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return QRectF(x0, y0, x1 - x0, y1 - y0)
+
+    def _image_qimage(self, img: np.ndarray) -> QImage:
+        """Return the cached QImage wrapper, rebuilt only when the buffer moves."""
+        ptr = img.ctypes.data
+        if self._qimg is None or self._qimg_shape != img.shape or self._qimg_data_ptr != ptr:
+            self._qimg = _wrap_qimage(img)
+            self._qimg_shape = img.shape
+            self._qimg_data_ptr = ptr
+        return self._qimg
+
     def paintEvent(self, event):
-        del event
         img = self._get_image()
         if img is None:
             return
         H, W, _ = img.shape
-        qimg = QImage(img.data, W, H, 4 * W, QImage.Format.Format_RGBA8888)
+        src = self._exposed_image_rect(event.rect(), H, W)
+        if src is None:
+            return
+        qimg = self._image_qimage(img)
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
         painter.scale(self._zoom, self._zoom)
-        painter.drawImage(0, 0, qimg)
+        # With the painter scaled, drawing the source rect onto itself blits
+        # only the exposed pixels instead of the whole canvas.
+        painter.drawImage(src, qimg, src)
 
         if self._show_overlay is not None and self._show_overlay() and self._get_overlay_mask is not None:
             overlay_mask = self._get_overlay_mask()
             if overlay_mask is not None and overlay_mask.shape[:2] == (H, W):
                 overlay = np.zeros((H, W, 4), dtype=np.uint8)
                 overlay[overlay_mask] = np.array([255, 255, 0, 140], dtype=np.uint8)
-                overlay_img = QImage(overlay.data, W, H, 4 * W, QImage.Format.Format_RGBA8888)
-                painter.drawImage(0, 0, overlay_img)
+                painter.drawImage(src, _wrap_qimage(overlay), src)
 
         if self._hover_pos is not None and self._get_brush_radius is not None:
             tool = self._get_tool() if self._get_tool is not None else None
             radius = self._get_brush_radius() if self._get_brush_radius is not None else 0
             if tool is None or getattr(tool, "name", "") in ("BRUSH", "ERASER", "EYEDROPPER"):
-                pen = QPen(QColor(0, 255, 0, 180))
-                pen.setStyle(Qt.PenStyle.DashLine)
-                painter.setPen(pen)
+                painter.setPen(self._hover_pen)
                 y, x = self._hover_pos.y(), self._hover_pos.x()
                 painter.drawEllipse(QPointF(x + 0.5, y + 0.5), radius, radius)
         painter.end()
@@ -87,12 +156,30 @@ class CanvasWidget(QWidget):
         y = int(pos.y() / self._zoom)
         return y, x
 
+    def _flush_pending(self):
+        if self._pending_pos is None or self._on_stroke_move is None:
+            return
+        y1, x1 = self._widget_to_image_coords(self._pending_pos)
+        self._pending_pos = None
+        if self._last_applied is None:
+            self._on_stroke_move(y1, x1)
+        else:
+            y0, x0 = self._last_applied
+            radius = self._get_brush_radius() if self._get_brush_radius is not None else 1
+            span = max(abs(y1 - y0), abs(x1 - x0))
+            steps = max(1, -(-span // max(1, radius)))
+            for i in range(1, steps + 1):
+                self._on_stroke_move(y0 + (y1 - y0) * i // steps, x0 + (x1 - x0) * i // steps)
+        self._last_applied = (y1, x1)
+
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
             self._last_pos = event.position().toPoint()
             y, x = self._widget_to_image_coords(self._last_pos)
+            self._pending_pos = None
             if self._on_stroke_begin is not None:
                 self._on_stroke_begin(y, x)
+            self._last_applied = (y, x)
             self._handle_hover(self._last_pos)
         elif event.button() == Qt.MouseButton.RightButton:
             pos = event.position().toPoint()
@@ -101,9 +188,9 @@ class CanvasWidget(QWidget):
     def mouseMoveEvent(self, event):
         if self._last_pos is not None and (event.buttons() & Qt.MouseButton.LeftButton):
             pos = event.position().toPoint()
-            y, x = self._widget_to_image_coords(pos)
-            if self._on_stroke_move is not None:
-                self._on_stroke_move(y, x)
+            self._pending_pos = pos
+            if not self._repaint_timer.isActive():
+                self._repaint_timer.start()
             self._last_pos = pos
             self._handle_hover(pos)
         else:
@@ -112,15 +199,20 @@ class CanvasWidget(QWidget):
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
+            self._repaint_timer.stop()
+            self._flush_pending()
             self._last_pos = None
+            self._last_applied = None
             if self._on_stroke_end is not None:
                 self._on_stroke_end()
         self._handle_hover(event.position().toPoint())
 
     def leaveEvent(self, event):
         del event
+        old = self._hover_pos
         self._hover_pos = None
-        self.update()
+        if old is not None:
+            self.update(self._hover_ring_rect(old))
 
     def wheelEvent(self, event):
         delta = event.angleDelta().y()
@@ -132,9 +224,21 @@ class CanvasWidget(QWidget):
         self.updateGeometry()
         self.update()
 
+    def _hover_ring_rect(self, pos: QPoint) -> QRect:
+        radius = self._get_brush_radius() if self._get_brush_radius is not None else 0
+        z = self._zoom
+        r = int((radius + 2) * z) + 2
+        cx = int((pos.x() + 0.5) * z)
+        cy = int((pos.y() + 0.5) * z)
+        return QRect(cx - r, cy - r, 2 * r + 1, 2 * r + 1)
+
     def _handle_hover(self, pos: QPoint):
         y, x = self._widget_to_image_coords(pos)
+        old = self._hover_pos
         self._hover_pos = QPoint(x, y)
         if self._on_hover is not None:
             self._on_hover(y, x)
-        self.update()
+        # Repaint only where the hover ring was and where it moved to.
+        if old is not None:
+            self.update(self._hover_ring_rect(old))
+        self.update(self._hover_ring_rect(self._hover_pos))
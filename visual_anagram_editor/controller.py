@@ -6,22 +6,107 @@ from typing import List, Optional
 
 from .permutation_model import PermutationModel
 
+try:
+    from numba import njit, prange
+
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+
+if _HAVE_NUMBA:
+
+    @njit(parallel=True, cache=True)
+    def _outline_kernel(perm, H, W, out):
+        """Flag A-pixels whose B-image is not 4-adjacent to a neighbor's B-image."""
+        for y in prange(H):
+            for x in range(W):
+                i = y * W + x
+                b = perm[i]
+                yB = b // W
+                xB = b - yB * W
+                flagged = False
+                if y > 0:
+                    j = perm[i - W]
+                    if abs(j // W - yB) + abs(j % W - xB) != 1:
+                        flagged = True
+                if not flagged and y < H - 1:
+                    j = perm[i + W]
+                    if abs(j // W - yB) + abs(j % W - xB) != 1:
+                        flagged = True
+                if not flagged and x > 0:
+                    j = perm[i - 1]
+                    if abs(j // W - yB) + abs(j % W - xB) != 1:
+                        flagged = True
+                if not flagged and x < W - 1:
+                    j = perm[i + 1]
+                    if abs(j // W - yB) + abs(j % W - xB) != 1:
+                        flagged = True
+                out[i] = flagged
+
+
+def _outline_flags_numpy(perm: np.ndarray, H: int, W: int) -> np.ndarray:
+    """NumPy fallback for the outline flags when Numba is not installed."""
+    coordsB = np.stack(np.divmod(perm.reshape(H, W), W), axis=-1)
+    flagged = np.zeros((H, W), dtype=bool)
+    # Each interior slice pair covers one neighbor direction and its opposite;
+    # a non-adjacent B-image flags both pixels of the pair.
+    vert = np.abs(coordsB[1:, :] - coordsB[:-1, :]).sum(axis=-1) != 1
+    flagged[1:, :] |= vert
+    flagged[:-1, :] |= vert
+    horiz = np.abs(coordsB[:, 1:] - coordsB[:, :-1]).sum(axis=-1) != 1
+    flagged[:, 1:] |= horiz
+    flagged[:, :-1] |= horiz
+    return flagged
+
+
+# Disk radius from which stamp offsets are reordered along a Z-order curve.
+_MORTON_MIN_RADIUS = 32
+
+
+def _morton_interleave(v: np.ndarray) -> np.ndarray:
+    """Spread the low 16 bits of each value so they occupy even bit positions."""
+    v = v.astype(np.uint32)
+    v = (v | (v << 8)) & np.uint32(0x00FF00FF)
+    v = (v | (v << 4)) & np.uint32(0x0F0F0F0F)
+    v = (v | (v << 2)) & np.uint32(0x33333333)
+    v = (v | (v << 1)) & np.uint32(0x55555555)
+    return v
+
+
+def _pack_u32(rgba: np.ndarray) -> np.uint32:
+    """Pack one RGBA uint8 quadruple into a native-endian uint32 word."""
+    return np.frombuffer(np.ascontiguousarray(rgba, dtype=np.uint8).tobytes(), dtype=np.uint32)[0]
+
 
 @dataclass
-class PixelChange:
-    yA: int
-    xA: int
-    oldA: np.ndarray
-    newA: np.ndarray
-    yB: int
-    xB: int
-    oldB: np.ndarray
-    newB: np.ndarray
+class SolidStamp:
+    """Finalized stroke whose pixels all received the same packed color.
+
+    idxA/idxB are flat int32 pixel indices; colors are packed uint32 RGBA
+    words. Storing new_u32 once instead of per pixel halves the history
+    footprint for eraser and other constant-color strokes.
+    """
+
+    idxA: np.ndarray
+    idxB: np.ndarray
+    oldA_u32: np.ndarray
+    oldB_u32: np.ndarray
+    new_u32: np.uint32
 
 
 @dataclass
-class Stroke:
-    changes: List[PixelChange]
+class BlendStamp:
+    """Finalized stroke with per-pixel new colors (opacity blends)."""
+
+    idxA: np.ndarray
+    idxB: np.ndarray
+    oldA_u32: np.ndarray
+    oldB_u32: np.ndarray
+    new_u32: np.ndarray
+
+
+Stroke = SolidStamp | BlendStamp
 
 
 class Tool(Enum):
@@ -40,14 +125,43 @@ class VisualAnagramController:
         self.brush_opacity_percent = 100
         self.brush_radius = 4  # default size
         self.eraser_color = np.array([0, 0, 0, 0], dtype=np.uint8)  # transparent erase
+        self._eraser_u32 = _pack_u32(self.eraser_color)
+        # Flat uint32 views over imgA/imgB; one store writes a whole pixel.
+        self._imgA_u32: Optional[np.ndarray] = None
+        self._imgB_u32: Optional[np.ndarray] = None
         self.undo_stack: List[Stroke] = []
         self.redo_stack: List[Stroke] = []
-        self.current_stroke: Optional[Stroke] = None
+        self._stroke_active = False
+        # Pooled change buffers reused across strokes; _change_len is the
+        # write cursor, buffers grow geometrically and are never shrunk.
+        self._change_len = 0
+        self._change_capacity = 0
+        self._change_idxA: Optional[np.ndarray] = None
+        self._change_idxB: Optional[np.ndarray] = None
+        self._change_oldA: Optional[np.ndarray] = None
+        self._change_oldB: Optional[np.ndarray] = None
+        self._change_new: Optional[np.ndarray] = None
         self.max_undo = 50  # default limit
         self.flagged_pixels_A: List[tuple[int, int]] = []
         self.flagged_mask_A: Optional[np.ndarray] = None
         self.flagged_mask_B: Optional[np.ndarray] = None
-        self._stroke_touched_A: Optional[set[tuple[int, int]]] = None
+        self._stroke_touched: Optional[np.ndarray] = None  # uint8 bitmap, size H*W
+        self._disk_cache: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        self._flagged_idx_A: Optional[np.ndarray] = None
+        # Inclusive (y0, x0, y1, x1) bounds of the last brush stamp, per canvas.
+        self.last_dirty_rect_A: Optional[tuple[int, int, int, int]] = None
+        self.last_dirty_rect_B: Optional[tuple[int, int, int, int]] = None
+        # Contiguous int32 aliases of the model's permutation tables; half
+        # the index bandwidth of int64 on every gather/scatter.
+        self._perm32: Optional[np.ndarray] = None
+        self._inv_perm32: Optional[np.ndarray] = None
+        # Permutation-decoded coordinates, filled in load_permutation:
+        # (_yB_flat, _xB_flat)[idxA] is the B-image of A-pixel idxA and
+        # (_yA_flat, _xA_flat)[idxB] the A-image of B-pixel idxB.
+        self._yB_flat: Optional[np.ndarray] = None
+        self._xB_flat: Optional[np.ndarray] = None
+        self._yA_flat: Optional[np.ndarray] = None
+        self._xA_flat: Optional[np.ndarray] = None
 
     def load_permutation(self, path: str):
         perm_model = PermutationModel.from_npy(path)
@@ -55,19 +169,35 @@ class VisualAnagramController:
         H, W = perm_model.H, perm_model.W
         self.imgA = np.zeros((H, W, 4), dtype=np.uint8)
         self.imgB = np.zeros((H, W, 4), dtype=np.uint8)
+        self._refresh_image_views()
+        self._perm32 = np.ascontiguousarray(perm_model.perm.astype(np.int32, copy=False))
+        self._inv_perm32 = np.ascontiguousarray(perm_model.inv_perm.astype(np.int32, copy=False))
+        self._yB_flat, self._xB_flat = np.divmod(self._perm32, W)
+        self._yA_flat, self._xA_flat = np.divmod(self._inv_perm32, W)
         self.undo_stack.clear()
         self.redo_stack.clear()
-        self.current_stroke = None
+        self._stroke_active = False
+        self._change_len = 0
         self._compute_piece_outline_flags()
 
+    def _refresh_image_views(self):
+        """Rebuild the flat uint32 views after imgA/imgB buffers are replaced."""
+        self._imgA_u32 = self.imgA.reshape(-1).view(np.uint32)
+        self._imgB_u32 = self.imgB.reshape(-1).view(np.uint32)
+
     def _load_image(self, path: str) -> np.ndarray:
         if self.permutation is None:
             raise ValueError("Permutation must be loaded before loading images")
         with Image.open(path) as im:
             im = im.convert("RGBA")
-            im = im.resize((self.permutation.W, self.permutation.H), Image.Resampling.LANCZOS)
+            # Strong downscales gain nothing visible from LANCZOS; BILINEAR is
+            # several times faster there (and SIMD-accelerated by pillow-simd).
+            ratio = max(im.width / self.permutation.W, im.height / self.permutation.H)
+            resample = Image.Resampling.BILINEAR if ratio >= 2 else Image.Resampling.LANCZOS
+            im = im.resize((self.permutation.W, self.permutation.H), resample)
             arr = np.array(im, dtype=np.uint8)
-        return arr
+        # Contiguous buffers let the canvas widgets wrap the pixels zero-copy.
+        return np.ascontiguousarray(arr)
 
     def load_image_into_A(self, path: str):
         arr = self._load_image(path)
@@ -75,7 +205,8 @@ class VisualAnagramController:
         self._propagate_A_to_B()
         self.undo_stack.clear()
         self.redo_stack.clear()
-        self.current_stroke = None
+        self._stroke_active = False
+        self._change_len = 0
 
     def load_image_into_B(self, path: str):
         arr = self._load_image(path)
@@ -83,7 +214,8 @@ class VisualAnagramController:
         self._propagate_B_to_A()
         self.undo_stack.clear()
         self.redo_stack.clear()
-        self.current_stroke = None
+        self._stroke_active = False
+        self._change_len = 0
 
     def save_image_A(self, path: str):
         if self.imgA is None:
@@ -98,20 +230,20 @@ class VisualAnagramController:
     def _propagate_A_to_B(self):
         if self.permutation is None or self.imgA is None:
             raise ValueError("Permutation and image must be loaded")
-        H, W = self.permutation.H, self.permutation.W
-        flatA = self.imgA.reshape(-1, 4)
-        flatB = np.empty_like(flatA)
-        flatB[self.permutation.perm] = flatA
-        self.imgB = flatB.reshape(H, W, 4)
+        if self.imgB is None or self.imgB.shape != self.imgA.shape:
+            self.imgB = np.empty_like(self.imgA)
+        self._refresh_image_views()
+        # Word-wide scatter: each store moves a whole RGBA pixel at once
+        # instead of a strided 4-byte row.
+        self._imgB_u32[self._perm32] = self._imgA_u32
 
     def _propagate_B_to_A(self):
         if self.permutation is None or self.imgB is None:
             raise ValueError("Permutation and image must be loaded")
-        H, W = self.permutation.H, self.permutation.W
-        flatB = self.imgB.reshape(-1, 4)
-        flatA = np.empty_like(flatB)
-        flatA[self.permutation.inv_perm] = flatB
-        self.imgA = flatA.reshape(H, W, 4)
+        if self.imgA is None or self.imgA.shape != self.imgB.shape:
+            self.imgA = np.empty_like(self.imgB)
+        self._refresh_image_views()
+        self._imgA_u32[self._inv_perm32] = self._imgB_u32
 
     def set_tool(self, tool: Tool):
         self.current_tool = tool
@@ -122,167 +254,210 @@ class VisualAnagramController:
         self.brush_color[3] = np.uint8(255)
 
     def set_brush_radius(self, radius: int):
+        # Old disk entries stay cached; they are reusable if the user
+        # returns to a previous radius.
         self.brush_radius = max(1, int(radius))
 
+    def _get_disk(self, radius: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return cached (dy, dx) offset arrays covering a disk of the given radius."""
+        disk = self._disk_cache.get(radius)
+        if disk is None:
+            offsets = np.arange(-radius, radius + 1)
+            dy, dx = np.meshgrid(offsets, offsets, indexing="ij")
+            inside = dy * dy + dx * dx <= radius * radius
+            dy = dy[inside].ravel()
+            dx = dx[inside].ravel()
+            if radius >= _MORTON_MIN_RADIUS:
+                # Large disks touch many scattered cache lines through the
+                # permutation gather; visiting offsets in Z-order keeps nearby
+                # source pixels together and improves line reuse.
+                code = (_morton_interleave(dy + radius) << 1) | _morton_interleave(dx + radius)
+                order = np.argsort(code)
+                dy = dy[order]
+                dx = dx[order]
+            disk = (dy, dx)
+            self._disk_cache[radius] = disk
+        return disk
+
     def set_brush_opacity_percent(self, opacity_percent: int):
         self.brush_opacity_percent = max(0, min(100, int(opacity_percent)))
 
-    def _blend_with_brush(self, base_pixel: np.ndarray) -> np.ndarray:
-        """Blend RGB with brush color using brush_opacity_percent. Preserve alpha."""
+    def _blend_colors(self, base_pixels: np.ndarray) -> np.ndarray:
+        """Blend RGB with brush color using brush_opacity_percent. Preserve alpha.
+
+        Operates on a batch of RGBA rows with shape (N, 4).
+        """
         opacity = self.brush_opacity_percent
+        out = base_pixels.copy()
         if opacity <= 0:
-            return base_pixel.copy()
+            return out
         if opacity >= 100:
-            out = self.brush_color.copy()
-            out[3] = base_pixel[3]
+            out[:, :3] = self.brush_color[:3]
             return out
-        out = base_pixel.copy()
-        old_rgb = base_pixel[:3].astype(np.float32)
-        brush_rgb = self.brush_color[:3].astype(np.float32)
-        blended = ((100 - opacity) * old_rgb + opacity * brush_rgb) / 100.0
-        out[:3] = np.round(blended).astype(np.uint8)
+        # Rounded integer blend in uint16; max term is 255 * 100, well below 65535.
+        old_rgb = base_pixels[:, :3].astype(np.uint16)
+        brush_rgb = self.brush_color[:3].astype(np.uint16)
+        blended = (old_rgb * (100 - opacity) + brush_rgb * opacity + 50) // 100
+        out[:, :3] = blended.astype(np.uint8)
         return out
 
-    def _set_pixel_A_and_B(self, yA: int, xA: int, color: np.ndarray, blend: bool = False):
-        if self.permutation is None or self.imgA is None or self.imgB is None:
-            return
-
-        H, W = self.permutation.H, self.permutation.W
-        if not (0 <= yA < H and 0 <= xA < W):
-            return
-
-        yB, xB = self.permutation.map_coords_A_to_B(yA, xA)
-        if not (0 <= yB < H and 0 <= xB < W):
-            return
-
-        key = (yA, xA)
-        if self.current_stroke is not None and self._stroke_touched_A is not None and key in self._stroke_touched_A:
-            # Apply each pixel at most once per stroke to avoid compounding blend.
-            return
-
-        oldA = self.imgA[yA, xA].copy()
-        oldB = self.imgB[yB, xB].copy()
-        new_color = self._blend_with_brush(oldA) if blend else color.copy()
-
-        if self.current_stroke is not None:
-            newA = new_color
-            newB = new_color
-            if not np.array_equal(oldA, newA) or not np.array_equal(oldB, newB):
-                self.current_stroke.changes.append(
-                    PixelChange(
-                        yA=yA,
-                        xA=xA,
-                        oldA=oldA,
-                        newA=newA.copy(),
-                        yB=yB,
-                        xB=xB,
-                        oldB=oldB,
-                        newB=newB.copy(),
-                    )
-                )
-            if self._stroke_touched_A is not None:
-                self._stroke_touched_A.add(key)
-
-        self.imgA[yA, xA] = new_color
-        self.imgB[yB, xB] = new_color
-
-    def _set_pixel_B_and_A(self, yB: int, xB: int, color: np.ndarray, blend: bool = False):
-        if self.permutation is None or self.imgA is None or self.imgB is None:
-            return
+    def _filter_fresh_and_mark(self, idxA: np.ndarray) -> np.ndarray:
+        """Keep only A-pixels not yet touched in this stroke and mark them touched.
 
-        H, W = self.permutation.H, self.permutation.W
-        if not (0 <= yB < H and 0 <= xB < W):
-            return
+        Applying each pixel at most once per stroke avoids compounding blend.
+        """
+        if not self._stroke_active or self._stroke_touched is None:
+            return np.ones(idxA.size, dtype=bool)
+        fresh = self._stroke_touched[idxA] == 0
+        self._stroke_touched[idxA] = 1
+        return fresh
 
-        yA, xA = self.permutation.map_coords_B_to_A(yB, xB)
-        if not (0 <= yA < H and 0 <= xA < W):
+    def _ensure_change_capacity(self, extra: int):
+        needed = self._change_len + extra
+        if needed <= self._change_capacity:
             return
-
-        key = (yA, xA)
-        if self.current_stroke is not None and self._stroke_touched_A is not None and key in self._stroke_touched_A:
-            # Apply each pixel at most once per stroke to avoid compounding blend.
+        capacity = max(needed, 2 * self._change_capacity, 65536)
+        n = self._change_len
+
+        def grown(old: Optional[np.ndarray], shape: tuple, dtype) -> np.ndarray:
+            buf = np.empty(shape, dtype=dtype)
+            if old is not None and n > 0:
+                buf[:n] = old[:n]
+            return buf
+
+        self._change_idxA = grown(self._change_idxA, (capacity,), np.int32)
+        self._change_idxB = grown(self._change_idxB, (capacity,), np.int32)
+        self._change_oldA = grown(self._change_oldA, (capacity,), np.uint32)
+        self._change_oldB = grown(self._change_oldB, (capacity,), np.uint32)
+        self._change_new = grown(self._change_new, (capacity,), np.uint32)
+        self._change_capacity = capacity
+
+    def _record_changes(self, idxA: np.ndarray, idxB: np.ndarray, oldA: np.ndarray, oldB: np.ndarray, new: np.ndarray):
+        changed = (new != oldA) | (new != oldB)
+        n = int(np.count_nonzero(changed))
+        if n == 0:
             return
-
-        oldA = self.imgA[yA, xA].copy()
-        oldB = self.imgB[yB, xB].copy()
-        new_color = self._blend_with_brush(oldB) if blend else color.copy()
-
-        if self.current_stroke is not None:
-            newA = new_color
-            newB = new_color
-            if not np.array_equal(oldA, newA) or not np.array_equal(oldB, newB):
-                self.current_stroke.changes.append(
-                    PixelChange(
-                        yA=yA,
-                        xA=xA,
-                        oldA=oldA,
-                        newA=newA.copy(),
-                        yB=yB,
-                        xB=xB,
-                        oldB=oldB,
-                        newB=newB.copy(),
-                    )
-                )
-            if self._stroke_touched_A is not None:
-                self._stroke_touched_A.add(key)
-
-        self.imgB[yB, xB] = new_color
-        self.imgA[yA, xA] = new_color
+        self._ensure_change_capacity(n)
+        i = self._change_len
+        self._change_idxA[i : i + n] = idxA[changed]
+        self._change_idxB[i : i + n] = idxB[changed]
+        self._change_oldA[i : i + n] = oldA[changed]
+        self._change_oldB[i : i + n] = oldB[changed]
+        self._change_new[i : i + n] = new[changed]
+        self._change_len = i + n
 
     def apply_brush_A(self, y: int, x: int):
-        if self.permutation is None or self.imgA is None or self.imgB is None:
-            return
-        H, W = self.permutation.H, self.permutation.W
-        radius2 = self.brush_radius * self.brush_radius
-
-        if self.current_tool in (Tool.BRUSH, Tool.ERASER):
-            is_brush = self.current_tool == Tool.BRUSH
-            color = self.brush_color if is_brush else self.eraser_color
-            for dy in range(-self.brush_radius, self.brush_radius + 1):
-                for dx in range(-self.brush_radius, self.brush_radius + 1):
-                    if dy * dy + dx * dx <= radius2:
-                        yy = y + dy
-                        xx = x + dx
-                        self._set_pixel_A_and_B(yy, xx, color, blend=is_brush)
-        elif self.current_tool == Tool.EYEDROPPER:
-            if 0 <= y < H and 0 <= x < W:
-                picked = self.imgA[y, x].copy()
-                picked[3] = np.uint8(255)
-                self.set_brush_color(picked)
+        self._apply_brush(y, x, forward=True)
 
     def apply_brush_B(self, y: int, x: int):
-        if self.permutation is None or self.imgA is None or self.imgB is None:
+        self._apply_brush(y, x, forward=False)
+
+    def _apply_brush(self, y: int, x: int, forward: bool):
+        """Apply the current tool at (y, x) on canvas A (forward) or canvas B."""
+        permutation = self.permutation
+        imgA = self.imgA
+        imgB = self.imgB
+        if permutation is None or imgA is None or imgB is None:
             return
-        H, W = self.permutation.H, self.permutation.W
-        radius2 = self.brush_radius * self.brush_radius
-
-        if self.current_tool in (Tool.BRUSH, Tool.ERASER):
-            is_brush = self.current_tool == Tool.BRUSH
-            color = self.brush_color if is_brush else self.eraser_color
-            for dy in range(-self.brush_radius, self.brush_radius + 1):
-                for dx in range(-self.brush_radius, self.brush_radius + 1):
-                    if dy * dy + dx * dx <= radius2:
-                        yy = y + dy
-                        xx = x + dx
-                        self._set_pixel_B_and_A(yy, xx, color, blend=is_brush)
-        elif self.current_tool == Tool.EYEDROPPER:
+        H, W = permutation.H, permutation.W
+        self.last_dirty_rect_A = None
+        self.last_dirty_rect_B = None
+        tool = self.current_tool
+
+        if tool in (Tool.BRUSH, Tool.ERASER):
+            is_brush = tool == Tool.BRUSH
+            dy, dx = self._get_disk(self.brush_radius)
+            yy = y + dy
+            xx = x + dx
+            inside = (yy >= 0) & (yy < H) & (xx >= 0) & (xx < W)
+            idx_src = yy[inside] * W + xx[inside]
+            # A validated permutation always maps into [0, H*W); no second
+            # bounds check is needed on the gathered indices.
+            if forward:
+                idxA = idx_src
+                idxB = self._perm32[idxA]
+            else:
+                idxB = idx_src
+                idxA = self._inv_perm32[idxB]
+
+            fresh = self._filter_fresh_and_mark(idxA)
+            idxA = idxA[fresh]
+            idxB = idxB[fresh]
+            if idxA.size == 0:
+                return
+
+            flatA = imgA.reshape(-1, 4)
+            flatB = imgB.reshape(-1, 4)
+            imgA_u32 = self._imgA_u32
+            imgB_u32 = self._imgB_u32
+            if is_brush:
+                new = self._blend_colors(flatA[idxA] if forward else flatB[idxB])
+                new_u32 = np.ascontiguousarray(new).view(np.uint32).ravel()
+            else:
+                new = None
+                new_u32 = np.broadcast_to(self._eraser_u32, idxA.shape)
+
+            if self._stroke_active:
+                self._record_changes(idxA, idxB, imgA_u32[idxA], imgB_u32[idxB], new_u32)
+
+            if is_brush:
+                flatA[idxA] = new
+                flatB[idxB] = new
+            else:
+                imgA_u32[idxA] = self._eraser_u32
+                imgB_u32[idxB] = self._eraser_u32
+
+            r = self.brush_radius
+            stamp_rect = (max(0, y - r), max(0, x - r), min(H - 1, y + r), min(W - 1, x + r))
+            if forward:
+                yB = self._yB_flat[idxA]
+                xB = self._xB_flat[idxA]
+                self.last_dirty_rect_A = stamp_rect
+                self.last_dirty_rect_B = (int(yB.min()), int(xB.min()), int(yB.max()), int(xB.max()))
+            else:
+                yA = self._yA_flat[idxB]
+                xA = self._xA_flat[idxB]
+                self.last_dirty_rect_B = stamp_rect
+                self.last_dirty_rect_A = (int(yA.min()), int(xA.min()), int(yA.max()), int(xA.max()))
+        elif tool == Tool.EYEDROPPER:
             if 0 <= y < H and 0 <= x < W:
-                picked = self.imgB[y, x].copy()
+                picked = (imgA if forward else imgB)[y, x].copy()
                 picked[3] = np.uint8(255)
                 self.set_brush_color(picked)
 
     def begin_stroke(self):
-        self.current_stroke = Stroke(changes=[])
+        self._stroke_active = True
+        self._change_len = 0
         self.redo_stack.clear()
-        self._stroke_touched_A = set()
+        if self.permutation is not None:
+            self._stroke_touched = np.zeros(self.permutation.HW, dtype=np.uint8)
 
     def end_stroke(self):
-        if self.current_stroke is not None and self.current_stroke.changes:
-            self.undo_stack.append(self.current_stroke)
+        if self._stroke_active and self._change_len > 0:
+            n = self._change_len
+            new = self._change_new[:n]
+            # undo/redo broadcast new_u32 either way, so a stroke that wrote a
+            # single color can keep one word instead of an N-word column.
+            if bool((new == new[0]).all()):
+                new_u32 = np.uint32(new[0])
+                kind = SolidStamp
+            else:
+                new_u32 = new.copy()
+                kind = BlendStamp
+            self.undo_stack.append(
+                kind(
+                    idxA=self._change_idxA[:n].copy(),
+                    idxB=self._change_idxB[:n].copy(),
+                    oldA_u32=self._change_oldA[:n].copy(),
+                    oldB_u32=self._change_oldB[:n].copy(),
+                    new_u32=new_u32,
+                )
+            )
             if len(self.undo_stack) > self.max_undo:
                 self.undo_stack.pop(0)
-        self.current_stroke = None
-        self._stroke_touched_A = None
+        self._stroke_active = False
+        self._change_len = 0
+        self._stroke_touched = None
 
     def can_undo(self) -> bool:
         return len(self.undo_stack) > 0
@@ -290,22 +465,30 @@ class VisualAnagramController:
     def can_redo(self) -> bool:
         return len(self.redo_stack) > 0
 
+    def _set_dirty_rects_from_stroke(self, stroke: Stroke):
+        """Publish the stroke's bounding boxes as the last dirty rects."""
+        W = self.permutation.W
+        yA, xA = np.divmod(stroke.idxA, W)
+        yB, xB = np.divmod(stroke.idxB, W)
+        self.last_dirty_rect_A = (int(yA.min()), int(xA.min()), int(yA.max()), int(xA.max()))
+        self.last_dirty_rect_B = (int(yB.min()), int(xB.min()), int(yB.max()), int(xB.max()))
+
     def undo(self):
         if not self.can_undo():
             return
         stroke = self.undo_stack.pop()
-        for change in reversed(stroke.changes):
-            self.imgA[change.yA, change.xA] = change.oldA
-            self.imgB[change.yB, change.xB] = change.oldB
+        self._imgA_u32[stroke.idxA] = stroke.oldA_u32
+        self._imgB_u32[stroke.idxB] = stroke.oldB_u32
+        self._set_dirty_rects_from_stroke(stroke)
         self.redo_stack.append(stroke)
 
     def redo(self):
         if not self.can_redo():
             return
         stroke = self.redo_stack.pop()
-        for change in stroke.changes:
-            self.imgA[change.yA, change.xA] = change.newA
-            self.imgB[change.yB, change.xB] = change.newB
+        self._imgA_u32[stroke.idxA] = stroke.new_u32
+        self._imgB_u32[stroke.idxB] = stroke.new_u32
+        self._set_dirty_rects_from_stroke(stroke)
         self.undo_stack.append(stroke)
 
     def _compute_piece_outline_flags(self):
@@ -313,35 +496,26 @@ class VisualAnagramController:
             self.flagged_pixels_A = []
             self.flagged_mask_A = None
             self.flagged_mask_B = None
+            self._flagged_idx_A = None
             return
 
         H, W = self.permutation.H, self.permutation.W
-        flagged_A = np.zeros((H, W), dtype=bool)
-
-        neighbors = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        for y in range(H):
-            for x in range(W):
-                yB, xB = self.permutation.map_coords_A_to_B(y, x)
-                is_boundary = False
-                for dy, dx in neighbors:
-                    yn = y + dy
-                    xn = x + dx
-                    if not (0 <= yn < H and 0 <= xn < W):
-                        continue
-                    ynB, xnB = self.permutation.map_coords_A_to_B(yn, xn)
-                    manhattan = abs(ynB - yB) + abs(xnB - xB)
-                    if manhattan != 1:
-                        is_boundary = True
-                        break
-                flagged_A[y, x] = is_boundary
+        perm_flat = self._perm32 if self._perm32 is not None else np.ascontiguousarray(self.permutation.perm)
+        if _HAVE_NUMBA:
+            out = np.zeros(H * W, dtype=np.bool_)
+            _outline_kernel(perm_flat, H, W, out)
+            flagged_A = out.reshape(H, W)
+        else:
+            flagged_A = _outline_flags_numpy(perm_flat, H, W)
 
         flagged_indices_A = np.flatnonzero(flagged_A.reshape(-1))
         flagged_B_flat = np.zeros(H * W, dtype=bool)
         if flagged_indices_A.size > 0:
-            flagged_indices_B = self.permutation.perm[flagged_indices_A]
+            flagged_indices_B = perm_flat[flagged_indices_A]
             flagged_B_flat[flagged_indices_B] = True
 
         self.flagged_mask_A = flagged_A
         self.flagged_mask_B = flagged_B_flat.reshape(H, W)
+        self._flagged_idx_A = flagged_indices_A
         ys, xs = np.where(flagged_A)
         self.flagged_pixels_A = list(zip(ys.tolist(), xs.tolist()))
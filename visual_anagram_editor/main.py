@@ -1,7 +1,7 @@
 import sys
 import numpy as np
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QAction, QActionGroup, QColor
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QAction, QActionGroup, QColor, QIcon, QPixmap
 from PyQt6.QtWidgets import (
     QApplication,
     QColorDialog,
@@ -25,6 +25,37 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.controller = VisualAnagramController()
         self._show_piece_outlines = False
+        # Status updates arrive per mouse event; coalesce them to ~10 Hz and
+        # skip the QStatusBar repaint entirely when nothing changed.
+        self._pending_status: tuple[int | None, int | None, str | None] = (None, None, None)
+        self._last_status_key: tuple | None = None
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(100)
+        self._status_timer.timeout.connect(self._flush_status)
+        # Slider drags emit one valueChanged per tick; sync the paired
+        # widgets immediately but apply to the controller on the trailing
+        # edge only.
+        self._pending_brush_size: int | None = None
+        self._brush_size_timer = QTimer(self)
+        self._brush_size_timer.setSingleShot(True)
+        self._brush_size_timer.setInterval(50)
+        self._brush_size_timer.timeout.connect(self._apply_pending_brush_size)
+        self._pending_opacity: int | None = None
+        self._opacity_timer = QTimer(self)
+        self._opacity_timer.setSingleShot(True)
+        self._opacity_timer.setInterval(50)
+        self._opacity_timer.timeout.connect(self._apply_pending_opacity)
+        # Repaint requests from one event are accumulated and flushed with a
+        # single mark_dirty per widget per event-loop turn.
+        # Brush QColor rebuilt only when the underlying RGBA bytes change.
+        self._cached_rgba: tuple[int, int, int, int] | None = None
+        self._cached_qcolor = QColor()
+        self._repaint_scheduled = False
+        self._dirty_A = False
+        self._dirty_B = False
+        self._dirty_rect_A: tuple[int, int, int, int] | None = None
+        self._dirty_rect_B: tuple[int, int, int, int] | None = None
         self._init_ui()
 
     def _init_ui(self):
@@ -147,15 +178,11 @@ class MainWindow(QMainWindow):
 
         self._color_button = QPushButton("Color")
         self._color_button.clicked.connect(self._choose_color)
+        # Reused swatch buffer: a pixmap fill is far cheaper than the CSS
+        # reparse a per-change setStyleSheet would trigger.
+        self._color_swatch = QPixmap(24, 24)
         toolbar.addWidget(self._color_button)
-        self._update_color_button(
-            QColor(
-                int(self.controller.brush_color[0]),
-                int(self.controller.brush_color[1]),
-                int(self.controller.brush_color[2]),
-                int(self.controller.brush_color[3]),
-            )
-        )
+        self._update_color_button(self._brush_qcolor())
 
         toolbar.addSeparator()
         toolbar.addWidget(QLabel("Size:"))
@@ -204,37 +231,47 @@ class MainWindow(QMainWindow):
         self.controller.set_tool(tool)
         self._update_status()
 
+    def _brush_qcolor(self) -> QColor:
+        """QColor for the controller's brush color, rebuilt only on change."""
+        col = self.controller.brush_color
+        rgba = (col[0].item(), col[1].item(), col[2].item(), col[3].item())
+        if rgba != self._cached_rgba:
+            self._cached_rgba = rgba
+            self._cached_qcolor = QColor(*rgba)
+        return self._cached_qcolor
+
     def _choose_color(self):
-        initial = QColor(
-            int(self.controller.brush_color[0]),
-            int(self.controller.brush_color[1]),
-            int(self.controller.brush_color[2]),
-            int(self.controller.brush_color[3]),
-        )
-        color = QColorDialog.getColor(initial, self, "Select brush color")
+        color = QColorDialog.getColor(self._brush_qcolor(), self, "Select brush color")
         if color.isValid():
             rgba = np.array([color.red(), color.green(), color.blue(), color.alpha()], dtype=np.uint8)
             self.controller.set_brush_color(rgba)
-            self._update_color_button(color)
+            self._update_color_button(self._brush_qcolor())
             self._update_status()
 
     def _update_color_button(self, color: QColor):
-        qss = f"background-color: rgba({color.red()},{color.green()},{color.blue()},{color.alpha()});"
-        self._color_button.setStyleSheet(qss)
+        self._color_swatch.fill(color)
+        self._color_button.setIcon(QIcon(self._color_swatch))
         self._sync_opacity_controls_from_color()
 
     def _brush_size_changed_from_slider(self, value: int):
         self._brush_spin.blockSignals(True)
         self._brush_spin.setValue(value)
         self._brush_spin.blockSignals(False)
-        self.controller.set_brush_radius(value)
-        self._update_status()
+        self._pending_brush_size = value
+        self._brush_size_timer.start()
 
     def _brush_size_changed_from_spinbox(self, value: int):
         self._brush_slider.blockSignals(True)
         self._brush_slider.setValue(value)
         self._brush_slider.blockSignals(False)
-        self.controller.set_brush_radius(value)
+        self._pending_brush_size = value
+        self._brush_size_timer.start()
+
+    def _apply_pending_brush_size(self):
+        if self._pending_brush_size is None:
+            return
+        self.controller.set_brush_radius(self._pending_brush_size)
+        self._pending_brush_size = None
         self._update_status()
 
     def _current_opacity_percent(self) -> int:
@@ -255,25 +292,63 @@ class MainWindow(QMainWindow):
         self._opacity_spin.blockSignals(True)
         self._opacity_spin.setValue(value)
         self._opacity_spin.blockSignals(False)
-        self.controller.set_brush_opacity_percent(value)
-        self._refresh_color_button_from_controller()
-        self._update_status()
+        self._pending_opacity = value
+        self._opacity_timer.start()
 
     def _opacity_changed_from_spinbox(self, value: int):
         self._opacity_slider.blockSignals(True)
         self._opacity_slider.setValue(value)
         self._opacity_slider.blockSignals(False)
-        self.controller.set_brush_opacity_percent(value)
+        self._pending_opacity = value
+        self._opacity_timer.start()
+
+    def _apply_pending_opacity(self):
+        if self._pending_opacity is None:
+            return
+        self.controller.set_brush_opacity_percent(self._pending_opacity)
+        self._pending_opacity = None
         self._refresh_color_button_from_controller()
         self._update_status()
 
+    @staticmethod
+    def _union_rect(a, b):
+        """Union of two inclusive (y0, x0, y1, x1) rects; None means full canvas."""
+        if a is None or b is None:
+            return None
+        return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+    def _schedule_repaint(self, dirty_A: bool = True, dirty_B: bool = True,
+                          rect_A: tuple[int, int, int, int] | None = None,
+                          rect_B: tuple[int, int, int, int] | None = None):
+        """Accumulate dirty rects and repaint each canvas at most once per event-loop turn."""
+        if dirty_A:
+            self._dirty_rect_A = self._union_rect(self._dirty_rect_A, rect_A) if self._dirty_A else rect_A
+            self._dirty_A = True
+        if dirty_B:
+            self._dirty_rect_B = self._union_rect(self._dirty_rect_B, rect_B) if self._dirty_B else rect_B
+            self._dirty_B = True
+        if not self._repaint_scheduled:
+            self._repaint_scheduled = True
+            QTimer.singleShot(0, self._flush_repaints)
+
+    def _flush_repaints(self):
+        self._repaint_scheduled = False
+        if self._dirty_A:
+            self.canvasA.mark_dirty(self._dirty_rect_A)
+        if self._dirty_B:
+            self.canvasB.mark_dirty(self._dirty_rect_B)
+        self._dirty_A = self._dirty_B = False
+        self._dirty_rect_A = self._dirty_rect_B = None
+
     def _stroke_begin_A(self, y: int, x: int):
         if self.controller.permutation is None:
             return
         self.controller.begin_stroke()
         self.controller.apply_brush_A(y, x)
-        self.canvasA.update()
-        self.canvasB.update()
+        self._schedule_repaint(
+            rect_A=self.controller.last_dirty_rect_A,
+            rect_B=self.controller.last_dirty_rect_B,
+        )
         if self.controller.current_tool == Tool.EYEDROPPER:
             self._refresh_color_button_from_controller()
         self._update_status(y, x, from_canvas="A")
@@ -282,8 +357,10 @@ class MainWindow(QMainWindow):
         if self.controller.permutation is None:
             return
         self.controller.apply_brush_A(y, x)
-        self.canvasA.update()
-        self.canvasB.update()
+        self._schedule_repaint(
+            rect_A=self.controller.last_dirty_rect_A,
+            rect_B=self.controller.last_dirty_rect_B,
+        )
         if self.controller.current_tool == Tool.EYEDROPPER:
             self._refresh_color_button_from_controller()
         self._update_status(y, x, from_canvas="A")
@@ -293,8 +370,6 @@ class MainWindow(QMainWindow):
             return
         self.controller.end_stroke()
         self._update_undo_redo_actions()
-        self.canvasA.update()
-        self.canvasB.update()
         self._update_status()
 
     def _stroke_begin_B(self, y: int, x: int):
@@ -302,8 +377,10 @@ class MainWindow(QMainWindow):
             return
         self.controller.begin_stroke()
         self.controller.apply_brush_B(y, x)
-        self.canvasA.update()
-        self.canvasB.update()
+        self._schedule_repaint(
+            rect_A=self.controller.last_dirty_rect_A,
+            rect_B=self.controller.last_dirty_rect_B,
+        )
         if self.controller.current_tool == Tool.EYEDROPPER:
             self._refresh_color_button_from_controller()
         self._update_status(y, x, from_canvas="B")
@@ -312,8 +389,10 @@ class MainWindow(QMainWindow):
         if self.controller.permutation is None:
             return
         self.controller.apply_brush_B(y, x)
-        self.canvasA.update()
-        self.canvasB.update()
+        self._schedule_repaint(
+            rect_A=self.controller.last_dirty_rect_A,
+            rect_B=self.controller.last_dirty_rect_B,
+        )
         if self.controller.current_tool == Tool.EYEDROPPER:
             self._refresh_color_button_from_controller()
         self._update_status(y, x, from_canvas="B")
@@ -323,14 +402,10 @@ class MainWindow(QMainWindow):
             return
         self.controller.end_stroke()
         self._update_undo_redo_actions()
-        self.canvasA.update()
-        self.canvasB.update()
         self._update_status()
 
     def _refresh_color_button_from_controller(self):
-        col = self.controller.brush_color
-        color = QColor(int(col[0]), int(col[1]), int(col[2]), int(col[3]))
-        self._update_color_button(color)
+        self._update_color_button(self._brush_qcolor())
 
     def _toggle_piece_outlines(self, checked: bool):
         self._show_piece_outlines = checked
@@ -342,16 +417,14 @@ class MainWindow(QMainWindow):
             self._act_outline_toggle.blockSignals(True)
             self._act_outline_toggle.setChecked(checked)
             self._act_outline_toggle.blockSignals(False)
-        self.canvasA.update()
-        self.canvasB.update()
+        self._schedule_repaint()
         self._update_status()
 
     def _load_perm(self):
         path, _ = QFileDialog.getOpenFileName(self, "Load permutation", "", "NumPy files (*.npy)")
         if path:
             self.controller.load_permutation(path)
-            self.canvasA.update()
-            self.canvasB.update()
+            self._schedule_repaint()
             self._update_status()
             self._update_undo_redo_actions()
 
@@ -359,16 +432,14 @@ class MainWindow(QMainWindow):
         path, _ = QFileDialog.getOpenFileName(self, "Load image into A", "", "Images (*.png *.jpg *.jpeg)")
         if path:
             self.controller.load_image_into_A(path)
-            self.canvasA.update()
-            self.canvasB.update()
+            self._schedule_repaint()
             self._update_undo_redo_actions()
 
     def _load_image_B(self):
         path, _ = QFileDialog.getOpenFileName(self, "Load image into B", "", "Images (*.png *.jpg *.jpeg)")
         if path:
             self.controller.load_image_into_B(path)
-            self.canvasA.update()
-            self.canvasB.update()
+            self._schedule_repaint()
             self._update_undo_redo_actions()
 
     def _save_image_A(self):
@@ -390,16 +461,20 @@ class MainWindow(QMainWindow):
     def _undo(self):
         if self.controller.can_undo():
             self.controller.undo()
-            self.canvasA.update()
-            self.canvasB.update()
+            self._schedule_repaint(
+                rect_A=self.controller.last_dirty_rect_A,
+                rect_B=self.controller.last_dirty_rect_B,
+            )
         self._update_undo_redo_actions()
         self._update_status()
 
     def _redo(self):
         if self.controller.can_redo():
             self.controller.redo()
-            self.canvasA.update()
-            self.canvasB.update()
+            self._schedule_repaint(
+                rect_A=self.controller.last_dirty_rect_A,
+                rect_B=self.controller.last_dirty_rect_B,
+            )
         self._update_undo_redo_actions()
         self._update_status()
 
@@ -410,9 +485,19 @@ class MainWindow(QMainWindow):
             self._act_redo.setEnabled(self.controller.can_redo())
 
     def _update_status(self, y: int | None = None, x: int | None = None, from_canvas: str | None = None):
+        self._pending_status = (y, x, from_canvas)
+        if not self._status_timer.isActive():
+            self._status_timer.start()
+
+    def _flush_status(self):
+        y, x, from_canvas = self._pending_status
         tool = self.controller.current_tool.name
         size = self.controller.brush_radius
         col = self.controller.brush_color
+        key = (y, x, from_canvas, tool, size, col[0], col[1], col[2], col[3])
+        if key == self._last_status_key:
+            return
+        self._last_status_key = key
         color_desc = f"rgba({int(col[0])},{int(col[1])},{int(col[2])},{int(col[3])})"
         coord_desc = ""
         if from_canvas and y is not None and x is not None and self.controller.permutation is not None:
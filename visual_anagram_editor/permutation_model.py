@@ -1,13 +1,90 @@
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
-@dataclass
+def _label_pieces(disp: np.ndarray) -> np.ndarray:
+    """Label 4-connected regions of constant displacement with ids 0..K-1.
+
+    Pixels are grouped into horizontal runs of equal displacement in one
+    vectorized pass, then runs are merged across rows with union-find over
+    the deduplicated vertical run contacts. Cost is linear in the pixel
+    count plus near-linear in the number of run contacts, independent of
+    piece diameter, so a permutation with one canvas-sized rigid piece
+    labels as fast as one with none.
+    """
+    H, W = disp.shape
+    flat = disp.ravel()
+    breaks = np.empty(H * W, dtype=bool)
+    breaks[0] = True
+    breaks[1:] = flat[1:] != flat[:-1]
+    breaks[::W] = True
+    run = (np.cumsum(breaks) - 1).reshape(H, W)
+    R = run[-1, -1].item() + 1
+
+    same_v = disp[1:, :] == disp[:-1, :]
+    # Dedupe contacts on a single int64 key; a 1D unique is far cheaper
+    # than a row-wise one over pair columns.
+    keys = np.unique(run[:-1, :][same_v].astype(np.int64) * R + run[1:, :][same_v])
+    pairs = np.stack(np.divmod(keys, R), axis=1)
+
+    parent = list(range(R))
+
+    def find(i: int) -> int:
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    for a, b in pairs.tolist():
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[rb] = ra
+
+    roots = np.asarray(parent, dtype=np.int64)
+    while True:
+        jumped = roots[roots]
+        if np.array_equal(jumped, roots):
+            break
+        roots = jumped
+
+    # Compact surviving roots to dense 0..K-1 ids with a bitmap + cumsum.
+    is_root = np.zeros(R, dtype=bool)
+    is_root[roots] = True
+    dense = np.cumsum(is_root) - 1
+    return dense[roots[run]].astype(np.int32)
+
+
+def _piece_bboxes(ids: np.ndarray, ys: np.ndarray, xs: np.ndarray, K: int) -> np.ndarray:
+    """Per-piece inclusive (y0, x0, y1, x1) boxes over the given coordinates."""
+    bbox = np.empty((K, 4), dtype=np.int32)
+    bbox[:, 0] = np.iinfo(np.int32).max
+    bbox[:, 1] = np.iinfo(np.int32).max
+    bbox[:, 2] = -1
+    bbox[:, 3] = -1
+    np.minimum.at(bbox[:, 0], ids, ys)
+    np.minimum.at(bbox[:, 1], ids, xs)
+    np.maximum.at(bbox[:, 2], ids, ys)
+    np.maximum.at(bbox[:, 3], ids, xs)
+    return bbox
+
+
+@dataclass(slots=True, frozen=True)
 class PermutationModel:
     H: int
     W: int
-    perm: np.ndarray  # shape (H*W,), dtype=int64
-    inv_perm: np.ndarray  # shape (H*W,), dtype=int64
+    perm: np.ndarray  # shape (H*W,), dtype=int32
+    inv_perm: np.ndarray  # shape (H*W,), dtype=int32
+    perm_yx: np.ndarray  # shape (H, W, 2), int32 (yB, xB) per A-pixel
+    inv_perm_yx: np.ndarray  # shape (H, W, 2), int32 (yA, xA) per B-pixel
+    piece_id_A: np.ndarray  # shape (H, W), int32 piece label per A-pixel
+    pieces_bbox_A: np.ndarray  # shape (K, 4), int32 inclusive (y0, x0, y1, x1) in A-space
+    pieces_bbox_B: np.ndarray  # shape (K, 4), int32 inclusive (y0, x0, y1, x1) in B-space
+    HW: int = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "HW", self.H * self.W)
 
     @classmethod
     def from_npy(cls, path: str) -> "PermutationModel":
@@ -16,34 +93,73 @@ class PermutationModel:
             raise ValueError("Permutation must be a 1D array")
 
         N = perm_raw.size
-        if np.unique(perm_raw).size != N:
-            raise ValueError("Permutation is not bijective")
-        if perm_raw.min() != 0 or perm_raw.max() != N - 1:
+        # Range check must come first: negative indices would wrap silently
+        # in the fancy-indexed bitmap fill below.
+        if perm_raw.min() < 0 or perm_raw.max() >= N:
             raise ValueError("Permutation indices must be 0..N-1")
+        seen = np.zeros(N, dtype=bool)
+        seen[perm_raw] = True
+        if not seen.all():
+            raise ValueError("Permutation is not bijective")
 
         side = int(np.sqrt(N))
         if side * side != N:
             raise ValueError("Permutation size must form a square image")
+        if N >= 2**31:
+            raise ValueError("Permutation size exceeds int32 index range")
+
+        # int32 indices suffice for any canvas below 2^31 pixels and halve
+        # the memory traffic of every gather through these tables. Cast once
+        # up front so the inverse is scattered directly at the final dtype.
+        perm = perm_raw.astype(np.int32, copy=False)
+        inv_perm = np.empty(N, dtype=np.int32)
+        inv_perm[perm] = np.arange(N, dtype=np.int32)
+        # Pieces are 4-connected regions that translate rigidly from A to B
+        # (constant displacement). Encoding (dy, dx) as dy*2W + dx keeps the
+        # pair unique since |dx| < W.
+        yB, xB = np.divmod(perm.reshape(side, side), side)
+        yA, xA = np.divmod(np.arange(N, dtype=np.int32).reshape(side, side), side)
+        disp = (yB - yA) * (2 * side) + (xB - xA)
+        # Coordinate lookup tables make per-pixel A<->B mapping two plain int
+        # reads, with no flat-index arithmetic or divmod on the hot hover path.
+        perm_yx = np.ascontiguousarray(np.stack((yB, xB), axis=-1))
+        inv_perm_yx = np.ascontiguousarray(
+            np.stack(np.divmod(inv_perm.reshape(side, side), side), axis=-1)
+        )
+        piece_id_A = _label_pieces(disp)
+        K = int(piece_id_A.max()) + 1
+        ids = piece_id_A.ravel()
+        pieces_bbox_A = _piece_bboxes(ids, yA.ravel(), xA.ravel(), K)
+        pieces_bbox_B = _piece_bboxes(ids, yB.ravel(), xB.ravel(), K)
 
-        inv_perm = np.empty_like(perm_raw)
-        inv_perm[perm_raw] = np.arange(N, dtype=perm_raw.dtype)
+        return cls(
+            H=side,
+            W=side,
+            perm=perm,
+            inv_perm=inv_perm,
+            perm_yx=perm_yx,
+            inv_perm_yx=inv_perm_yx,
+            piece_id_A=piece_id_A,
+            pieces_bbox_A=pieces_bbox_A,
+            pieces_bbox_B=pieces_bbox_B,
+        )
 
-        return cls(H=side, W=side, perm=perm_raw.astype(np.int64), inv_perm=inv_perm.astype(np.int64))
+    def pieces_touched_by_disk(self, y: int, x: int, r: int) -> np.ndarray:
+        """Return the unique piece ids under the box bounding a radius-r disk at (y, x)."""
+        y0 = max(0, y - r)
+        x0 = max(0, x - r)
+        return np.unique(self.piece_id_A[y0 : y + r + 1, x0 : x + r + 1])
 
     def forward_map_index(self, idxA: int) -> int:
-        return int(self.perm[idxA])
+        return self.perm[idxA].item()
 
     def inverse_map_index(self, idxB: int) -> int:
-        return int(self.inv_perm[idxB])
+        return self.inv_perm[idxB].item()
 
     def map_coords_A_to_B(self, y: int, x: int) -> tuple[int, int]:
-        idxA = y * self.W + x
-        idxB = self.perm[idxA]
-        yB, xB = divmod(int(idxB), self.W)
-        return yB, xB
+        p = self.perm_yx[y, x]
+        return p[0].item(), p[1].item()
 
     def map_coords_B_to_A(self, y: int, x: int) -> tuple[int, int]:
-        idxB = y * self.W + x
-        idxA = self.inv_perm[idxB]
-        yA, xA = divmod(int(idxA), self.W)
-        return yA, xA
+        p = self.inv_perm_yx[y, x]
+        return p[0].item(), p[1].item()